@@ -1,36 +1,96 @@
 """
 Composable middleware components for creating machine learning pipelines.
+
+The public names are imported from `middl.core` lazily, on first access (PEP 562),
+so that `import middl` on its own stays cheap.
 """
 
-from .core import (
-    AbortPipeline,
-    EmptyLoader,
-    Loader,
-    Middleware,
-    Pipeline,
-    PipelineWrapper,
-    SkipStep,
-    StrMapping,
-    ValidationError,
-    WrappedSizedLoader,
-    WrappedUnsizedLoader,
-    wrap_iterable,
-)
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .core import (
+        ABORT,
+        SKIP,
+        AbortPipeline,
+        AsyncLoader,
+        ChunkedLoader,
+        EmptyLoader,
+        Loader,
+        Middleware,
+        Pipeline,
+        PipelineWrapper,
+        PrefetchLoader,
+        SizedChunkedLoader,
+        SizedPrefetchLoader,
+        SkipStep,
+        StepSignal,
+        StrMapping,
+        ValidationError,
+        WrappedHintedLoader,
+        WrappedSizedLoader,
+        WrappedUnsizedLoader,
+        chunk,
+        fields,
+        prefetch,
+        wrap_iterable,
+    )
 
 __all__ = [
+    "ABORT",
+    "SKIP",
     "AbortPipeline",
+    "AsyncLoader",
+    "ChunkedLoader",
     "EmptyLoader",
     "Loader",
     "Middleware",
     "Pipeline",
     "PipelineWrapper",
+    "PrefetchLoader",
+    "SizedChunkedLoader",
+    "SizedPrefetchLoader",
     "SkipStep",
+    "StepSignal",
     "StrMapping",
     "ValidationError",
+    "WrappedHintedLoader",
     "WrappedSizedLoader",
     "WrappedUnsizedLoader",
+    "chunk",
+    "fields",
+    "prefetch",
     "wrap_iterable",
 ]
 
 
 __version__ = "0.0.1a8"
+
+
+def __getattr__(name: str) -> object:
+    """
+    Import a public name from `middl.core` on first access, and cache it.
+
+    The `core` submodule itself is also imported on first access, as it was bound
+    to the package when the package imported it eagerly.
+
+    Raises:
+        AttributeError: If `name` is not a public name of the package.
+
+    """
+    if name == "core":
+        # Importing a submodule binds it as an attribute of the package
+        return importlib.import_module(".core", __name__)
+
+    if name in __all__:
+        value = getattr(importlib.import_module(".core", __name__), name)
+        globals()[name] = value
+        return value
+
+    msg = f"module {__name__!r} has no attribute {name!r}"
+    raise AttributeError(msg)
+
+
+def __dir__() -> list[str]:
+    """Return the names of the module, including the not yet imported ones."""
+    return sorted({*globals(), *__all__})
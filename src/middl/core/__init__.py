@@ -3,28 +3,48 @@ Module containing core objects for implementing pipelines and creating
 concrete middleware subclasses.
 """
 
-from .errors import AbortPipeline, SkipStep, ValidationError
+from .errors import ABORT, SKIP, AbortPipeline, SkipStep, StepSignal, ValidationError
 from .loader import (
+    AsyncLoader,
+    ChunkedLoader,
     EmptyLoader,
     Loader,
+    PrefetchLoader,
+    SizedChunkedLoader,
+    SizedPrefetchLoader,
+    WrappedHintedLoader,
     WrappedSizedLoader,
     WrappedUnsizedLoader,
+    chunk,
+    prefetch,
     wrap_iterable,
 )
-from .middleware import Middleware, StrMapping
+from .middleware import Middleware, StrMapping, fields
 from .pipeline import Pipeline, PipelineWrapper
 
 __all__ = [
+    "ABORT",
+    "SKIP",
     "AbortPipeline",
+    "AsyncLoader",
+    "ChunkedLoader",
     "EmptyLoader",
     "Loader",
     "Middleware",
     "Pipeline",
     "PipelineWrapper",
+    "PrefetchLoader",
+    "SizedChunkedLoader",
+    "SizedPrefetchLoader",
     "SkipStep",
+    "StepSignal",
     "StrMapping",
     "ValidationError",
+    "WrappedHintedLoader",
     "WrappedSizedLoader",
     "WrappedUnsizedLoader",
+    "chunk",
+    "fields",
+    "prefetch",
     "wrap_iterable",
 ]
@@ -1,6 +1,16 @@
-"""Module defining middl-specific errors."""
+"""Module defining middl-specific errors and control flow signals."""
 
-__all__ = ["AbortPipeline", "SkipStep", "ValidationError"]
+from collections.abc import Set as AbstractSet
+from enum import Enum
+
+__all__ = [
+    "ABORT",
+    "SKIP",
+    "AbortPipeline",
+    "SkipStep",
+    "StepSignal",
+    "ValidationError",
+]
 
 
 class SkipStep(Exception):  # noqa: N818
@@ -25,5 +35,85 @@ class ValidationError(Exception):
     Exception raised when pipeline validation fails due to missing required fields.
 
     This exception indicates that the state or the batch from the data loader is missing
-    fields required by one of the middlewares.
+    fields required by one of the middlewares. It is also raised when a pipeline with a
+    middleware that only implements `astep` is run with `run` instead of `arun`.
+
+    Instead of a message, the details of the error can be given as attributes, in
+    which case the message is only formatted when the error is converted to a string.
+    This keeps failing validation cheap when the message is never displayed.
+
+    Attributes:
+        middleware: The name of the middleware class that failed validation.
+        index: The index of the middleware that failed validation in the pipeline.
+        missing: The names of the missing fields.
+        kind: The kind of the missing fields, either `"state"` or `"data"`.
+
     """
+
+    def __init__(
+        self,
+        message: str | None = None,
+        *,
+        middleware: str | None = None,
+        index: int | None = None,
+        missing: AbstractSet[str] | None = None,
+        kind: str | None = None,
+    ) -> None:
+        """
+        Initialize a ValidationError.
+
+        Args:
+            message: The error message. If not given, it is formatted from the other
+                arguments when needed.
+            middleware: The name of the middleware class that failed validation.
+            index: The index of the middleware that failed validation.
+            missing: The names of the missing fields.
+            kind: The kind of the missing fields, either `"state"` or `"data"`.
+
+        """
+        super().__init__(*(() if message is None else (message,)))
+        self.middleware = middleware
+        self.index = index
+        self.missing = missing
+        self.kind = kind
+
+    def __str__(self) -> str:
+        """
+        Return the error message, formatting it from the attributes if none was given.
+        """
+        if self.args:
+            return super().__str__()
+        if self.missing is not None:
+            return f"Missing {self.kind} fields {set(self.missing)}"
+        if self.middleware is not None:
+            return (
+                f"Validation error by middleware {self.middleware},"
+                f" at index {self.index}."
+            )
+        return ""
+
+    def __repr__(self) -> str:
+        """
+        Return a representation of the error, including its (formatted) message.
+        """
+        if self.args:
+            return super().__repr__()
+        return f"{type(self).__name__}({str(self)!r})"
+
+
+class StepSignal(Enum):
+    """
+    Signals that a middleware `step` can return to control the pipeline.
+
+    Returning `SKIP` has the same effect as raising `SkipStep`, and returning `ABORT`
+    the same effect as raising `AbortPipeline`, but without the cost of raising and
+    catching an exception. This is useful for middlewares that often skip steps,
+    such as filters.
+    """
+
+    SKIP = "skip"
+    ABORT = "abort"
+
+
+SKIP = StepSignal.SKIP
+ABORT = StepSignal.ABORT
@@ -4,19 +4,35 @@ Module defining data-loading classes and protocols.
 This module exports Loader, which is a common protocol for data loaders consumed by
 pipelines, and also provides EmptyLoader, a range equivalent for data loaders, and
 wrap_iterable, which wraps an iterable that returns tuples as batches, so that it
-conforms to the Loader protocol (returns dicts as batches).
+conforms to the Loader protocol (returns dicts as batches). It also provides
+PrefetchLoader, which loads batches of another loader in a background thread, and
+ChunkedLoader, which combines consecutive batches of another loader into one.
 """
 
-from collections.abc import Iterable, Iterator, Sequence, Sized
+import functools
+import itertools
+import operator
+import queue
+import threading
+from collections.abc import AsyncIterable, Callable, Iterable, Iterator, Sequence, Sized
+from collections.abc import Set as AbstractSet
 from typing import Any, Protocol, cast
 
-from .middleware import StrMapping
+from .middleware import StrMapping, fields
 
 __all__ = [
+    "AsyncLoader",
+    "ChunkedLoader",
     "EmptyLoader",
     "Loader",
+    "PrefetchLoader",
+    "SizedChunkedLoader",
+    "SizedPrefetchLoader",
+    "WrappedHintedLoader",
     "WrappedSizedLoader",
     "WrappedUnsizedLoader",
+    "chunk",
+    "prefetch",
     "wrap_iterable",
 ]
 
@@ -27,10 +43,47 @@ class Loader(Protocol, Iterable[StrMapping]):
 
     A loader should be an iterable that yields string-key mappings as batches
     of data, and should also have a `data_fields` attribute, which is used for
-    validating the pipeline.
+    validating the pipeline. The attribute is only read, so it can be any set
+    (a `set` or a `frozenset`, for example).
     """
 
-    data_fields: set[str]
+    @property
+    def data_fields(self) -> AbstractSet[str]:
+        """The keys present in each batch yielded by the loader."""
+
+
+class AsyncLoader(Protocol, AsyncIterable[StrMapping]):
+    """
+    A protocol for asynchronous data loaders, consumed by `Pipeline.arun`.
+
+    This is the same as `Loader`, except that batches are yielded by an
+    asynchronous iterator.
+    """
+
+    @property
+    def data_fields(self) -> AbstractSet[str]:
+        """The keys present in each batch yielded by the loader."""
+
+
+def _reused_batches(num_steps: int) -> Iterator[StrMapping]:
+    """
+    Yield the same dict `num_steps` times, emptying it before each yield.
+    """
+    batch: StrMapping = {}
+    for _ in range(num_steps):
+        if batch:
+            batch.clear()
+        yield batch
+
+
+def _reuses_batch(loader: object) -> bool:
+    """
+    Check whether the loader yields the same batch object at each step.
+
+    Such batches are only valid until the next batch is requested, so they can not
+    be loaded in advance.
+    """
+    return getattr(loader, "reuse_batch", False) is True
 
 
 class EmptyLoader:
@@ -39,6 +92,14 @@ class EmptyLoader:
 
     Useful for iteatring over epochs.
 
+    By default a new empty dict is yielded at each step, so that middlewares can add
+    data fields to it. If no middleware keeps a reference to the batch after its step,
+    `reuse_batch=True` can be used to yield the same dict at each step instead, which
+    is cleared when the next batch is requested. This avoids allocating a dict per
+    step, but it is incompatible with anything that requests batches in advance -
+    `PrefetchLoader` (and `Pipeline.run` with `prefetch`) and `Pipeline.arun` raise
+    a `ValueError` for such loaders.
+
     Example usage:
         >>> generator = EmptyGenerator(num_steps=3)
         >>> for batch in generator:
@@ -50,27 +111,38 @@ class EmptyLoader:
         3
     """
 
-    def __init__(self, num_steps: int) -> None:
+    __slots__ = ("data_fields", "num_steps", "reuse_batch")
+
+    def __init__(self, num_steps: int, reuse_batch: bool = False) -> None:
         """
         Initialize an EmptyGenerator instance.
 
         Args:
             num_steps: The number of steps (or batches) to generate.
+            reuse_batch: Whether to yield the same dict (cleared before each step)
+                at each step, instead of a new dict. (Default: False)
 
         """
         self.num_steps = num_steps
+        self.reuse_batch = reuse_batch
         self.data_fields: set[str] = set()
 
     def __iter__(self) -> Iterator[StrMapping]:
         """
         Create an iterator that yields empty dictionaries for each step.
 
-        Yields:
-            An iterator yielding empty dictionaries.
+        Without `reuse_batch`, the iterator is built from `itertools` iterators, so
+        there is no Python generator frame to resume at each step.
+
+        Returns:
+            An iterator yielding empty dictionaries (or the same dictionary, cleared
+            before each step, if `reuse_batch` is set).
 
         """
-        for _ in range(self.num_steps):
-            yield {}
+        if self.reuse_batch:
+            return _reused_batches(self.num_steps)
+
+        return itertools.starmap(dict, itertools.repeat((), self.num_steps))
 
     def __len__(self) -> int:
         """
@@ -83,6 +155,60 @@ class EmptyLoader:
         return self.num_steps
 
 
+def _batch_length_error(fields: tuple[str, ...], batch: Iterable[Any]) -> ValueError:
+    """Create the error raised when a batch does not have one item per data field."""
+    num_fields = len(fields)
+    # Batches can be any iterable, only sized ones can report their length
+    if isinstance(batch, Sized):
+        msg = f"Batch has {len(batch)} items, but {num_fields} data fields were given."
+    else:
+        msg = (
+            f"Batch has the wrong number of items, {num_fields} data fields were given."
+        )
+    return ValueError(msg)
+
+
+@functools.lru_cache(maxsize=128)
+def _make_unpacker(fields: tuple[str, ...]) -> Callable[[Sequence[Any]], StrMapping]:
+    """
+    Generate a function converting a sequence batch into a dict with `fields` keys.
+
+    The generated function unpacks the batch into local variables and builds the dict
+    with a literal, which avoids the per-batch `zip` and `dict` call overhead. The
+    unpacking also checks that the batch has exactly one item per field, so no
+    separate length check is needed. Only errors raised by the unpacking itself are
+    reported as length errors - a `ValueError` raised while iterating over the batch
+    is propagated unchanged.
+
+    Generated functions are cached, so loaders with the same fields share them.
+
+    Args:
+        fields: Keys of the output dict, in the order of the batch items.
+
+    Returns:
+        A function that takes a sequence batch and returns a dict batch.
+
+    """
+    names = [f"_{i}" for i in range(len(fields))]
+    targets = "".join(f"{name}, " for name in names)
+    items = ", ".join(
+        f"{key!r}: {name}" for key, name in zip(fields, names, strict=True)
+    )
+    src = (
+        "def unpack(batch):\n"
+        "    try:\n"
+        f"        ({targets}) = batch\n"
+        "    except ValueError as e:\n"
+        "        if e.__traceback__.tb_next is not None:\n"
+        "            raise\n"
+        "        raise length_error(fields, batch) from None\n"
+        f"    return {{{items}}}\n"
+    )
+    namespace: dict[str, Any] = {"fields": fields, "length_error": _batch_length_error}
+    exec(compile(src, "<middl-unpack>", "exec"), namespace)  # noqa: S102
+    return cast(Callable[[Sequence[Any]], StrMapping], namespace["unpack"])
+
+
 class WrappedUnsizedLoader:
     """
     A wrapper for iterable data loaders that return batches as sequences.
@@ -91,6 +217,8 @@ class WrappedUnsizedLoader:
     a dictionary using the fields specified in `data_fields`.
     """
 
+    __slots__ = ("_loader", "_unpack", "data_fields", "data_fields_seq")
+
     def __init__(
         self, loader: Iterable[Sequence[Any]], data_fields: Sequence[str]
     ) -> None:
@@ -107,8 +235,9 @@ class WrappedUnsizedLoader:
 
         """
         self._loader = loader
-        self.data_fields = set(data_fields)
+        self.data_fields = fields(*data_fields)
         self.data_fields_seq = data_fields
+        self._unpack = _make_unpacker(tuple(data_fields))
 
     def __iter__(self) -> Iterator[StrMapping]:
         """
@@ -119,11 +248,9 @@ class WrappedUnsizedLoader:
             in `data_fields`.
 
         """
+        unpack = self._unpack
         for batch in self._loader:
-            batch_dict: dict[str, Any] = dict(
-                zip(self.data_fields_seq, batch, strict=True)
-            )
-            yield batch_dict
+            yield unpack(batch)
 
 
 class WrappedSizedLoader(WrappedUnsizedLoader):
@@ -133,8 +260,31 @@ class WrappedSizedLoader(WrappedUnsizedLoader):
     In addition to converting sequence-based batches into dictionaries,
     this class implements the __len__ method, allowing callers to check
     the total number of batches.
+
+    The length of the wrapped loader is only computed once, on the first call to
+    __len__, and then cached - the wrapped loader should not change its length.
     """
 
+    __slots__ = ("_len",)
+
+    def __init__(
+        self, loader: Iterable[Sequence[Any]], data_fields: Sequence[str]
+    ) -> None:
+        """
+        Initialize a WrappedSizedLoader.
+
+        Args:
+            loader: A sized iterable that yields sequences (e.g., tuples or lists)
+                representing data batches.
+            data_fields: A sequence of string keys to use in the output dictionaries.
+                The number of keys must match the length of each sequence in the loader,
+                each item in batch will be assigned the key at the corresponding
+                position.
+
+        """
+        super().__init__(loader, data_fields)
+        self._len: int | None = None
+
     def __len__(self) -> int:
         """
         Return the number of batches in the wrapped loader.
@@ -143,12 +293,37 @@ class WrappedSizedLoader(WrappedUnsizedLoader):
             The length of the underlying loader.
 
         """
-        return len(cast(Sized, self._loader))
+        if self._len is None:
+            self._len = len(cast(Sized, self._loader))
+        return self._len
+
+
+class WrappedHintedLoader(WrappedUnsizedLoader):
+    """
+    A wrapper for iterable data loaders that return sequences and have a length hint.
+
+    Some iterables do not have a length, but can estimate it (by implementing
+    `__length_hint__`, see PEP 424). This class forwards the estimate, so that it
+    can be obtained with `operator.length_hint`. As the wrapper does not implement
+    __len__, the pipeline still treats the loader as unsized.
+    """
+
+    __slots__ = ()
+
+    def __length_hint__(self) -> int:
+        """
+        Return the estimated number of batches in the wrapped loader.
+
+        Returns:
+            The length hint of the underlying loader.
+
+        """
+        return operator.length_hint(self._loader)
 
 
 def wrap_iterable(
     loader: Iterable[Sequence[Any]], data_fields: Sequence[str]
-) -> WrappedSizedLoader | WrappedUnsizedLoader:
+) -> WrappedSizedLoader | WrappedHintedLoader | WrappedUnsizedLoader:
     """
     Wrap a sequence-yielding iterable, so that it conforms to Loader protocol.
 
@@ -157,7 +332,8 @@ def wrap_iterable(
     in a dict, with keys specified in `data_fields` argument.
 
     If the original data loader is a sizable (has length), the wrapped object
-    will also be.
+    will also be. If it is not sizable, but has a positive length hint, the wrapped
+    object will forward the length hint.
 
     Arguments:
         loader: An iterable, which yields sequences (tuples, lists, ...). Can be sized
@@ -174,4 +350,294 @@ def wrap_iterable(
     if isinstance(loader, Sized):
         return WrappedSizedLoader(loader, data_fields)
 
+    if operator.length_hint(loader, 0) > 0:
+        return WrappedHintedLoader(loader, data_fields)
+
     return WrappedUnsizedLoader(loader, data_fields)
+
+
+class _ProducerError:
+    """Container for an exception raised while producing batches."""
+
+    def __init__(self, error: BaseException) -> None:
+        self.error = error
+
+
+class _EndOfLoader:
+    """Marker signaling that the producer has exhausted the loader."""
+
+
+_QueueItem = StrMapping | _ProducerError | _EndOfLoader
+_WAIT_TIMEOUT = 0.1
+
+
+def _put(q: queue.Queue[_QueueItem], item: _QueueItem, stop: threading.Event) -> bool:
+    """
+    Put an item on the queue, waiting until there is space or `stop` is set.
+
+    Returns:
+        Whether the item was put on the queue.
+
+    """
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=_WAIT_TIMEOUT)
+        except queue.Full:
+            continue
+        return True
+    return False
+
+
+def _produce(
+    batches: Iterator[StrMapping], q: queue.Queue[_QueueItem], stop: threading.Event
+) -> None:
+    """
+    Put batches from an iterator on the queue, until it is exhausted or stopped.
+
+    Exceptions raised by the iterator are put on the queue, so that they can be
+    re-raised by the consumer. This includes exceptions such as `SystemExit` -
+    otherwise, the thread would end and leave the consumer waiting forever.
+    """
+    try:
+        for batch in batches:
+            if not _put(q, batch, stop):
+                return
+    except BaseException as e:  # noqa: BLE001
+        _put(q, _ProducerError(e), stop)
+        return
+
+    _put(q, _EndOfLoader(), stop)
+
+
+class PrefetchLoader:
+    """
+    A wrapper that loads batches from another loader in a background thread.
+
+    While the pipeline is processing the current batch, the following batches are
+    already being loaded (up to `depth` of them), which hides the loading time
+    behind the processing time. This is most useful for loaders that spend a lot of
+    time waiting on I/O.
+
+    Exceptions raised by the wrapped loader are re-raised when the batch that failed
+    to load would be yielded. When iteration stops early (for example, because the
+    pipeline was aborted), the background thread stops as well.
+    """
+
+    __slots__ = ("_loader", "data_fields", "depth")
+
+    def __init__(self, loader: Loader, depth: int = 2) -> None:
+        """
+        Initialize a PrefetchLoader.
+
+        Args:
+            loader: The loader to load batches from.
+            depth: The maximum number of batches loaded in advance. (Default: 2)
+
+        """
+        if depth < 1:
+            msg = f"Prefetch depth must be at least 1, got {depth}."
+            raise ValueError(msg)
+        if _reuses_batch(loader):
+            msg = "Can not prefetch batches from a loader that reuses its batch."
+            raise ValueError(msg)
+
+        self._loader = loader
+        self.depth = depth
+        self.data_fields = loader.data_fields
+
+    def __iter__(self) -> Iterator[StrMapping]:
+        """
+        Create an iterator that yields batches loaded in a background thread.
+
+        Yields:
+            Batches of the wrapped loader, in the same order.
+
+        """
+        # No point in a buffer larger than the (estimated) number of batches
+        hint = operator.length_hint(self._loader, 0)
+        q: queue.Queue[_QueueItem] = queue.Queue(
+            maxsize=min(self.depth, hint) if hint > 0 else self.depth
+        )
+        stop = threading.Event()
+        producer = threading.Thread(
+            target=_produce, args=(iter(self._loader), q, stop), daemon=True
+        )
+        producer.start()
+
+        try:
+            while True:
+                item = q.get()
+                if isinstance(item, _EndOfLoader):
+                    return
+                if isinstance(item, _ProducerError):
+                    raise item.error
+                yield item
+        finally:
+            stop.set()
+
+
+class SizedPrefetchLoader(PrefetchLoader):
+    """
+    A prefetching wrapper for loaders that have a length.
+
+    In addition to prefetching batches, this class implements the __len__ method,
+    which returns the length of the wrapped loader.
+    """
+
+    __slots__ = ()
+
+    def __len__(self) -> int:
+        """
+        Return the number of batches in the wrapped loader.
+
+        Returns:
+            The length of the underlying loader.
+
+        """
+        return len(cast(Sized, self._loader))
+
+
+def prefetch(loader: Loader, depth: int = 2) -> SizedPrefetchLoader | PrefetchLoader:
+    """
+    Wrap a loader, so that its batches are loaded in a background thread.
+
+    If the original data loader is a sizable (has length), the wrapped object
+    will also be.
+
+    Arguments:
+        loader: A loader to prefetch batches from. Can be sized (has length) or not.
+        depth: The maximum number of batches loaded in advance. (Default: 2)
+
+    Returns:
+        A wrapped data loader, that prefetches batches of `loader`.
+
+    """
+    if isinstance(loader, Sized):
+        return SizedPrefetchLoader(loader, depth)
+
+    return PrefetchLoader(loader, depth)
+
+
+class ChunkedLoader:
+    """
+    A wrapper that combines consecutive batches of another loader into one batch.
+
+    Each output batch has the same keys as the input batches, and the value for each
+    key is a list of the values from `chunk_size` consecutive input batches (a
+    "struct of arrays" layout). This way, middlewares are called once per chunk
+    instead of once per input batch, which pays off when input batches are small
+    (for example, single samples).
+
+    If `collate` is given, it is applied to each list of values - for example,
+    `numpy.asarray` can be used to get contiguous arrays instead of lists.
+    """
+
+    __slots__ = ("_loader", "chunk_size", "collate", "data_fields", "drop_last")
+
+    def __init__(
+        self,
+        loader: Loader,
+        chunk_size: int,
+        collate: Callable[[list[Any]], Any] | None = None,
+        drop_last: bool = False,
+    ) -> None:
+        """
+        Initialize a ChunkedLoader.
+
+        Args:
+            loader: The loader whose batches should be combined.
+            chunk_size: The number of input batches to combine into one.
+            collate: A function applied to the list of values for each key. If not
+                given, the lists are used as they are. (Default: None)
+            drop_last: Whether to drop the last chunk, if it has fewer than
+                `chunk_size` batches. (Default: False)
+
+        """
+        if chunk_size < 1:
+            msg = f"Chunk size must be at least 1, got {chunk_size}."
+            raise ValueError(msg)
+
+        self._loader = loader
+        self.chunk_size = chunk_size
+        self.collate = collate
+        self.drop_last = drop_last
+        self.data_fields = loader.data_fields
+
+    def __iter__(self) -> Iterator[StrMapping]:
+        """
+        Create an iterator that yields combined batches.
+
+        Yields:
+            A dict mapping each key of the input batches to the list (or the result
+            of `collate`) of its values in `chunk_size` consecutive input batches.
+
+        """
+        batches_iter = iter(self._loader)
+        chunk_size = self.chunk_size
+        collate = self.collate
+
+        while True:
+            batches = list(itertools.islice(batches_iter, chunk_size))
+            if not batches or (self.drop_last and len(batches) < chunk_size):
+                return
+
+            if collate is None:
+                yield {key: [b[key] for b in batches] for key in batches[0]}
+            else:
+                yield {key: collate([b[key] for b in batches]) for key in batches[0]}
+
+
+class SizedChunkedLoader(ChunkedLoader):
+    """
+    A chunking wrapper for loaders that have a length.
+
+    In addition to combining batches, this class implements the __len__ method, which
+    returns the number of chunks.
+    """
+
+    __slots__ = ()
+
+    def __len__(self) -> int:
+        """
+        Return the number of chunks.
+
+        Returns:
+            The length of the underlying loader divided by `chunk_size` - rounded down
+            if `drop_last` is set, and rounded up otherwise.
+
+        """
+        num_batches = len(cast(Sized, self._loader))
+        if self.drop_last:
+            return num_batches // self.chunk_size
+        return (num_batches + self.chunk_size - 1) // self.chunk_size
+
+
+def chunk(
+    loader: Loader,
+    chunk_size: int,
+    collate: Callable[[list[Any]], Any] | None = None,
+    drop_last: bool = False,
+) -> SizedChunkedLoader | ChunkedLoader:
+    """
+    Wrap a loader, so that its consecutive batches are combined into one.
+
+    If the original data loader is a sizable (has length), the wrapped object
+    will also be.
+
+    Arguments:
+        loader: A loader whose batches should be combined. Can be sized (has length)
+            or not.
+        chunk_size: The number of input batches to combine into one.
+        collate: A function applied to the list of values for each key. If not
+            given, the lists are used as they are. (Default: None)
+        drop_last: Whether to drop the last chunk, if it has fewer than `chunk_size`
+            batches. (Default: False)
+
+    Returns:
+        A wrapped data loader, that yields combined batches of `loader`.
+
+    """
+    if isinstance(loader, Sized):
+        return SizedChunkedLoader(loader, chunk_size, collate, drop_last)
+
+    return ChunkedLoader(loader, chunk_size, collate, drop_last)
@@ -1,32 +1,74 @@
 """
 Module defining middleware protocols and base classes.
 
-This module provides the Middleware abstract base class for middleware components.
+This module provides the Middleware base class for middleware components, and the
+fields helper, which creates shared frozensets of field names (such as the data
+fields of loaders).
 """
 
-from abc import ABC
+import functools
 from collections.abc import MutableMapping
 from typing import Any, Generic, TypeVar
 
-from .errors import ValidationError
+from .errors import StepSignal, ValidationError
 
-__all__ = ["Middleware", "StrMapping"]
+__all__ = ["Middleware", "StrMapping", "fields"]
 
 
 StrMapping = MutableMapping[str, Any]
 StateType_contra = TypeVar("StateType_contra", bound=StrMapping, contravariant=True)
 DataType_contra = TypeVar("DataType_contra", bound=StrMapping, contravariant=True)
 
+_FrozenFields = tuple[frozenset[str], frozenset[str], frozenset[str]]
 
-class Middleware(ABC, Generic[StateType_contra, DataType_contra]):
+
+@functools.lru_cache(maxsize=1024)
+def _intern_fields(field_set: frozenset[str]) -> frozenset[str]:
+    """
+    Return the first-seen frozenset equal to `field_set`, for recently used sets.
+    """
+    return field_set
+
+
+def fields(*names: str) -> frozenset[str]:
     """
-    Abstract base class for middleware components.
+    Create a frozenset of field names, shared by all callers with the same names.
+
+    Identical field sets (for example, the data fields of many loaders, or the frozen
+    copies from `Middleware.freeze`) are stored as a single object, which saves
+    memory, and the hash of the shared frozenset is only computed once. Only the
+    most recently used field sets are remembered, so that creating many distinct
+    sets does not grow memory without bound.
+
+    Field sets of middlewares are regular sets, so that they can be modified - use
+    set literals for them, not this function.
+
+    Example:
+        >>> fields("loss", "step") is fields("step", "loss")
+        True
+
+    Args:
+        names: The field names.
+
+    Returns:
+        A frozenset of the field names.
+
+    """
+    return _intern_fields(frozenset(names))
+
+
+class Middleware(Generic[StateType_contra, DataType_contra]):
+    """
+    Base class for middleware components.
 
     This class is generic over two types: one for the state and one for the data.
     Concrete middleware implementations should specify these generic types (typically
     as concrete TypedDict types) to benefit from IDE autocompletion and static type
     checking.
 
+    The class is not an `abc.ABC`, as none of its methods are abstract - this keeps
+    `isinstance` checks against it on the fast, non-ABC path.
+
     Concrete implementations should usually override the `step` method. Optionally, they
     can also override `on_start` and `on_finish` callbacks, in case there is some
     initialization/teardown that needs to be done at the start and at the end of
@@ -64,6 +106,13 @@ class Middleware(ABC, Generic[StateType_contra, DataType_contra]):
 
     """
 
+    __slots__ = (
+        "_frozen_fields",
+        "provides_data_fields",
+        "requires_data_fields",
+        "requires_state_fields",
+    )
+
     requires_state_fields: set[str]
 
     requires_data_fields: set[str]
@@ -76,16 +125,73 @@ class Middleware(ABC, Generic[StateType_contra, DataType_contra]):
         self.requires_state_fields = set()
         self.requires_data_fields = set()
         self.provides_data_fields = set()
+        self._frozen_fields: _FrozenFields | None = None
 
-    def step(self, state: StateType_contra, data: DataType_contra) -> None:
+    def freeze(self) -> _FrozenFields:
+        """
+        Return frozen copies of the required and provided field sets.
+
+        The copies are interned frozensets (see `fields`) of the required state fields,
+        the required data fields and the provided data fields, in this order. They are
+        kept on the middleware and only recreated when the field sets change, so they
+        reflect the current fields while staying cheap to hash and compare. The field
+        sets themselves are not changed.
+
+        Returns:
+            A tuple of required state, required data and provided data fields.
+
+        """
+        # Subclasses that do not call super().__init__() have no frozen copies yet
+        frozen = getattr(self, "_frozen_fields", None)
+        if (
+            frozen is None
+            or frozen[0] != self.requires_state_fields
+            or frozen[1] != self.requires_data_fields
+            or frozen[2] != self.provides_data_fields
+        ):
+            frozen = self._frozen_fields = (
+                fields(*self.requires_state_fields),
+                fields(*self.requires_data_fields),
+                fields(*self.provides_data_fields),
+            )
+        return frozen
+
+    def step(self, state: StateType_contra, data: DataType_contra) -> StepSignal | None:
         """
         Run the middleware processing step.
 
+        The pipeline calls this method with positional arguments (`state` first,
+        then `data`), so overrides must accept them positionally.
+
+        Args:
+            state: A dictionary representing the shared pipeline state.
+            data: A dictionary representing step data (batch).
+
+        Returns:
+            Usually `None`. Returning `SKIP` or `ABORT` skips the rest of the current
+            step or aborts the pipeline, like raising `SkipStep` or `AbortPipeline`.
+
+        """
+
+    async def astep(
+        self, state: StateType_contra, data: DataType_contra
+    ) -> StepSignal | None:
+        """
+        Run the middleware processing step asynchronously.
+
+        This is only used by `Pipeline.arun`, and only if overridden - otherwise
+        `arun` calls `step` directly. Override it for steps that wait on I/O, so that
+        other tasks (such as loading the next batch) can run in the meantime.
+
         Args:
             state: A dictionary representing the shared pipeline state.
             data: A dictionary representing step data (batch).
 
+        Returns:
+            The same as `step`.
+
         """
+        return self.step(state, data)
 
     def on_start(self, state: StateType_contra) -> None:
         """
@@ -127,18 +233,16 @@ class Middleware(ABC, Generic[StateType_contra, DataType_contra]):
             data_fields: Fields of the input data mapping.
 
         """
-        if not self.requires_state_fields.issubset(state_fields):
-            msg = (
-                "Missing state fields"
-                f" {self.requires_state_fields.difference(state_fields)}"
-            )
-            raise ValidationError(msg)
-
-        if not self.requires_data_fields.issubset(data_fields):
-            msg = (
-                "Missing data fields"
-                f" {self.requires_data_fields.difference(data_fields)}"
-            )
-            raise ValidationError(msg)
-
-        data_fields.update(self.provides_data_fields)
+        # Most middlewares require nothing, skip building the differences for them
+        if self.requires_state_fields:
+            missing = self.requires_state_fields - state_fields
+            if missing:
+                raise ValidationError(missing=missing, kind="state")
+
+        if self.requires_data_fields:
+            missing = self.requires_data_fields - data_fields
+            if missing:
+                raise ValidationError(missing=missing, kind="data")
+
+        if self.provides_data_fields:
+            data_fields.update(self.provides_data_fields)
@@ -6,21 +6,212 @@ batches from a data loader are processed sequentially through a series of middle
 components, which receive a shared state and batch (data) as their input.
 """
 
-from collections.abc import MutableMapping, Sequence, Sized
-from typing import Any
-
-from .errors import AbortPipeline, SkipStep, ValidationError
-from .loader import Loader
+import contextlib
+import sys
+from collections.abc import (
+    AsyncGenerator,
+    AsyncIterable,
+    Awaitable,
+    Callable,
+    MutableMapping,
+    Sequence,
+    Sized,
+)
+from collections.abc import Set as AbstractSet
+from typing import Any, cast
+
+from .errors import ABORT, SKIP, AbortPipeline, SkipStep, StepSignal, ValidationError
+from .loader import AsyncLoader, Loader, _reuses_batch
+from .loader import prefetch as prefetch_loader
 from .middleware import Middleware, StrMapping
 
 __all__ = ["Pipeline", "PipelineWrapper"]
 
 
+StepFunction = Callable[[StrMapping, StrMapping], StepSignal | None]
+
+# Maximum number of steps fused into one generated function
+_MAX_FUSED_STEPS = 32
+
+
+def _no_step(state: StrMapping, data: StrMapping) -> None:
+    """
+    Do nothing - the fused step of a pipeline without overriding middlewares.
+    """
+
+
+def _fuse_steps(steps: Sequence[StepFunction]) -> StepFunction:
+    """
+    Generate a single function that calls all `steps` in order.
+
+    The generated function calls each step directly as a global of its own
+    namespace, which avoids looping over the middlewares (and looking up their
+    `step` methods) on each batch. For more than `_MAX_FUSED_STEPS` steps, a plain
+    loop over the steps is used instead, to keep the generated code small.
+
+    If a step returns a signal (`SKIP` or `ABORT`), the remaining steps are not
+    called, and the signal is returned. Other return values are ignored. A single
+    step is returned as it is, and for no steps `_no_step` is returned, which
+    `Pipeline.run_inner` does not call.
+
+    Args:
+        steps: The step functions to call, each taking state and data.
+
+    Returns:
+        A function taking state and data, which passes them to each of the steps.
+
+    """
+    if len(steps) > _MAX_FUSED_STEPS:
+        steps = tuple(steps)
+
+        def looped_step(state: StrMapping, data: StrMapping) -> StepSignal | None:
+            for step in steps:
+                signal = step(state, data)
+                if signal is SKIP or signal is ABORT:
+                    return signal
+            return None
+
+        return looped_step
+
+    if not steps:
+        return _no_step
+    if len(steps) == 1:
+        # Nothing to fuse, the step can be called directly
+        return steps[0]
+
+    names = [f"step_{i}" for i in range(len(steps))]
+    body = "".join(
+        f"    signal = {name}(state, data)\n"
+        "    if signal is not None and (signal is SKIP or signal is ABORT):\n"
+        "        return signal\n"
+        for name in names[:-1]
+    )
+    body += f"    return {names[-1]}(state, data)\n"
+    src = "def fused_step(state, data):\n" + body
+
+    namespace: dict[str, Any] = dict(zip(names, steps, strict=True))
+    namespace.update(SKIP=SKIP, ABORT=ABORT)
+    exec(compile(src, "<middl-fused-step>", "exec"), namespace)  # noqa: S102
+    return cast(StepFunction, namespace["fused_step"])
+
+
+def _is_sized(data_loader: Loader | AsyncLoader) -> bool:
+    """
+    Check whether the data loader has a length, the same way that `len` does.
+
+    This looks `__len__` up on the type, which is cheaper than an `isinstance`
+    check against `collections.abc.Sized`. Like that check, it treats classes that
+    set `__len__ = None` as not sized.
+    """
+    return getattr(type(data_loader), "__len__", None) is not None
+
+
+async def _fetch_ahead(
+    data_loader: Loader | AsyncLoader,
+) -> AsyncGenerator[StrMapping, None]:
+    """
+    Iterate over the batches of a loader, always fetching the next batch in advance.
+
+    While the caller processes a batch, the next one is already being fetched - for
+    asynchronous loaders in a separate task, and for regular loaders in a separate
+    thread, so that a blocking loader does not block the event loop.
+
+    Args:
+        data_loader: A regular or an asynchronous loader.
+
+    Yields:
+        Batches of the loader, in the same order.
+
+    """
+    # Imported here, as importing asyncio takes longer than importing the package
+    import asyncio
+
+    end = object()
+    fetch: Callable[[], Awaitable[object]]
+    if isinstance(data_loader, AsyncIterable):
+        async_batches = aiter(data_loader)
+
+        def fetch() -> Awaitable[object]:
+            return anext(async_batches, end)
+
+    else:
+        batches = iter(data_loader)
+
+        def fetch() -> Awaitable[object]:
+            return asyncio.to_thread(next, batches, end)
+
+    pending = asyncio.ensure_future(fetch())
+    try:
+        while (data := await pending) is not end:
+            pending = asyncio.ensure_future(fetch())
+            yield cast(StrMapping, data)
+    finally:
+        pending.cancel()
+
+
+async def _run_async_steps(
+    steps: Sequence[tuple[Callable[[StrMapping, StrMapping], Any], bool]],
+    state: StrMapping,
+    data: StrMapping,
+) -> StepSignal | None:
+    """
+    Call the steps in order, awaiting the ones marked as asynchronous.
+
+    Args:
+        steps: Pairs of a step function and whether it is a coroutine function.
+        state: A dictionary representing the shared pipeline state.
+        data: A dictionary representing step data (batch).
+
+    Returns:
+        The first signal returned by a step, or `None` if no step returned one. Other
+        return values are ignored.
+
+    """
+    for step_fn, is_async in steps:
+        signal = step_fn(state, data)
+        if is_async:
+            signal = await signal
+        if signal is SKIP or signal is ABORT:
+            return signal
+    return None
+
+
+def _is_overridden(method: Callable[..., object], base: Callable[..., object]) -> bool:
+    """
+    Check whether a bound method of a middleware differs from the `base` function.
+    """
+    return getattr(method, "__func__", None) is not base
+
+
 class Pipeline:
     """
     Runs sequentially a series of middleware components to process data.
+
+    The `step`, `astep`, `on_start` and `on_finish` methods of the middlewares are
+    bound when the middlewares are assigned (the `step` methods are fused into a
+    single function), so they should not be replaced afterwards - assigning
+    `middlewares` again re-binds them. Methods that are not overridden are not
+    called at all, so middlewares that only implement `on_start`/`on_finish` add no
+    per-batch cost, in `run` and in `arun`.
+
+    Validation reads the current fields of the middlewares, so changing the fields
+    of a middleware after it was assigned to the pipeline is picked up by the next
+    validation.
     """
 
+    __slots__ = (
+        "_async_only",
+        "_async_steps",
+        "_has_custom_validate",
+        "_middlewares",
+        "_num_steps_key",
+        "_on_finishes",
+        "_on_starts",
+        "_step",
+        "_step_name",
+        "_validators",
+    )
+
     def __init__(
         self,
         middlewares: Sequence[Middleware],  # type: ignore[type-arg]
@@ -38,10 +229,80 @@ class Pipeline:
         self.middlewares = middlewares
         self.step_name = step_name
 
+    @property
+    def step_name(self) -> str:
+        """The key used to record the current step index in the state."""
+        return self._step_name
+
+    @step_name.setter
+    def step_name(self, step_name: str) -> None:
+        # Interned keys share their (cached) hash with equal user-provided keys
+        self._step_name = sys.intern(step_name)
+        self._num_steps_key = sys.intern(f"num_{step_name}s")
+
+    @property
+    def middlewares(self) -> Sequence[Middleware]:  # type: ignore[type-arg]
+        """The middleware components of the pipeline, in the order they are run."""
+        return self._middlewares
+
+    @middlewares.setter
+    def middlewares(
+        self,
+        middlewares: Sequence[Middleware],  # type: ignore[type-arg]
+    ) -> None:
+        self._middlewares = tuple(middlewares)
+
+        self._step = _fuse_steps(
+            [
+                mware.step
+                for mware in self._middlewares
+                if _is_overridden(mware.step, Middleware.step)
+            ]
+        )
+        # Index of the first middleware that can only be run by arun, if any
+        self._async_only = next(
+            (
+                i
+                for i, mware in enumerate(self._middlewares)
+                if _is_overridden(mware.astep, Middleware.astep)
+                and not _is_overridden(mware.step, Middleware.step)
+            ),
+            None,
+        )
+        # For arun, the coroutine function is preferred if a middleware has one
+        self._async_steps = tuple(
+            (mware.astep, True)
+            if _is_overridden(mware.astep, Middleware.astep)
+            else (mware.step, False)
+            for mware in self._middlewares
+            if _is_overridden(mware.astep, Middleware.astep)
+            or _is_overridden(mware.step, Middleware.step)
+        )
+        self._on_starts = tuple(
+            mware.on_start
+            for mware in self._middlewares
+            if _is_overridden(mware.on_start, Middleware.on_start)
+        )
+        self._on_finishes = tuple(
+            mware.on_finish
+            for mware in self._middlewares
+            if _is_overridden(mware.on_finish, Middleware.on_finish)
+        )
+        self._validators = tuple(
+            mware._validate  # noqa: SLF001
+            for mware in self._middlewares
+        )
+
+        # Whether some middleware validates in its own way (like PipelineWrapper)
+        self._has_custom_validate = any(
+            _is_overridden(mware._validate, Middleware._validate)  # noqa: SLF001
+            for mware in self._middlewares
+        )
+
     def validate(
         self,
-        state_fields: set[str],
-        data_fields: set[str],
+        state_fields: AbstractSet[str],
+        data_fields: AbstractSet[str],
         sized_data_loader: bool,
     ) -> None:
         """
@@ -59,6 +320,8 @@ class Pipeline:
         is True, it also adds `num_{step_name}s`. Middlewares are not expected to
         alter `state_fields`, with the exception of `PipelineWrapper`.
 
+        If no middleware requires any fields, the check is skipped.
+
         Args:
             state_fields: The set of keys that the pipeline expects in the shared
                `state` object at the start of processing.
@@ -72,29 +335,36 @@ class Pipeline:
                 or the data at any stage of validation.
 
         """
+        # Validation can only fail if some middleware requires fields, or validates
+        # in its own way
+        if not self._has_custom_validate and not any(
+            mware.requires_state_fields or mware.requires_data_fields
+            for mware in self._middlewares
+        ):
+            return
+
         # Create copy of fields sets to avoid modifying the original
         data_fields = set(data_fields)
         state_fields = set(state_fields)
 
         state_fields.add(self.step_name)
         if sized_data_loader:
-            state_fields.add(f"num_{self.step_name}s")
+            state_fields.add(self._num_steps_key)
 
-        for i, mware in enumerate(self.middlewares):
+        for i, validate_mware in enumerate(self._validators):
             try:
-                mware._validate(state_fields, data_fields)  # noqa: SLF001
+                validate_mware(state_fields, data_fields)
             except ValidationError as e:
-                msg = (
-                    "Validation error by middleware"
-                    f" {type(mware).__name__}, at index {i}."
-                )
-                raise ValidationError(msg) from e
+                raise ValidationError(
+                    middleware=type(self._middlewares[i]).__name__, index=i
+                ) from e
 
     def run(
         self,
         state: MutableMapping[str, Any],
         data_loader: Loader,
         validate: bool = True,
+        prefetch: int = 0,
     ) -> None:
         """
         Process batches from the data loader through the middleware chain.
@@ -110,6 +380,8 @@ class Pipeline:
         If a middleware raises an AbortPipeline exception, processing stops immediately.
         If a middleware raises a SkipStep exception, that step is skipped and
         processing continues with the next step.
+        Returning `ABORT` or `SKIP` from a middleware's `step` has the same effect,
+        without the cost of raising an exception.
 
         On each step, the current step index is recorded in the state using the key
         specified by `step_name`. If data loader has a length, this is added to state
@@ -128,41 +400,195 @@ class Pipeline:
             data_loader: An iterable that yields batches of data (as dictionaries).
             validate: Whether to validate the required fields before starting the
                 main loop. (Default: True)
+            prefetch: If larger than 0, batches are loaded from the data loader in
+                a background thread, up to `prefetch` batches in advance, while the
+                middlewares process the current batch. See `PrefetchLoader` for
+                details. (Default: 0)
 
         """
-        for mware in self.middlewares:
-            mware.on_start(state)
+        if prefetch > 0:
+            data_loader = prefetch_loader(data_loader, prefetch)
 
-        if isinstance(data_loader, Sized):
-            state[f"num_{self.step_name}s"] = len(data_loader)
+        self.on_start(state)
 
         if validate:
             self.validate(
-                set(state.keys()),
+                state.keys(),
                 data_loader.data_fields,
-                isinstance(data_loader, Sized),
+                _is_sized(data_loader),
+            )
+
+        self.run_inner(state, data_loader)
+        self.on_finish(state)
+
+    def run_inner(self, state: MutableMapping[str, Any], data_loader: Loader) -> None:
+        """
+        Run only the main loop of the pipeline, without hooks or validation.
+
+        This records `num_{step_name}s` (if the data loader has a length) and the
+        step index in the state, and passes each batch through the middleware chain,
+        handling `AbortPipeline` and `SkipStep` as `run` does. It assumes that
+        `on_start` was already called and that validation (if any) already took
+        place, which makes it suitable for running a nested pipeline many times.
+
+        Args:
+            state: A dictionary representing the shared pipeline state.
+            data_loader: An iterable that yields batches of data (as dictionaries).
+
+        Raises:
+            ValidationError: If a middleware only overrides `astep`, which can only
+                be run by `arun`.
+
+        """
+        if self._async_only is not None:
+            index = self._async_only
+            msg = (
+                f"Middleware {type(self._middlewares[index]).__name__}, at index"
+                f" {index}, only implements astep - use arun to run the pipeline."
             )
+            raise ValidationError(msg, index=index)
 
+        if _is_sized(data_loader):
+            state[self._num_steps_key] = len(cast(Sized, data_loader))
+
+        # Bind to locals, to avoid attribute lookups on each batch
+        fused_step = self._step
+        step_key = self.step_name
+        if fused_step is _no_step:
+            for step, _ in enumerate(data_loader):
+                state[step_key] = step
+            return
+
+        abort = ABORT
         for step, data in enumerate(data_loader):
-            state[self.step_name] = step
+            state[step_key] = step
 
             try:
-                for mware in self.middlewares:
-                    mware.step(state=state, data=data)
-            except AbortPipeline:
-                break
-            except SkipStep:
-                continue
+                if fused_step(state, data) is abort:
+                    break
+            except (AbortPipeline, SkipStep) as e:
+                if isinstance(e, AbortPipeline):
+                    break
+
+    async def arun(
+        self,
+        state: MutableMapping[str, Any],
+        data_loader: Loader | AsyncLoader,
+        validate: bool = True,
+    ) -> None:
+        """
+        Process batches from the data loader through the middleware chain, in asyncio.
+
+        This works the same way as `run`, with two differences. First, the next batch
+        is fetched while the current one is being processed - from an asynchronous
+        loader in a separate task, and from a regular loader in a separate thread.
+        Second, middlewares that override `astep` have it awaited instead of having
+        their `step` called.
+
+        Args:
+            state: A dictionary representing the shared pipeline state.
+            data_loader: An iterable or an asynchronous iterable that yields batches
+                of data (as dictionaries).
+            validate: Whether to validate the required fields before starting the
+                main loop. (Default: True)
+
+        Raises:
+            ValueError: If the data loader reuses its batch (for example, an
+                `EmptyLoader` with `reuse_batch=True`), because the next batch is
+                requested while the current one is still being processed.
+
+        """
+        self.on_start(state)
+
+        if validate:
+            self.validate(
+                state.keys(),
+                data_loader.data_fields,
+                _is_sized(data_loader),
+            )
+
+        await self.arun_inner(state, data_loader)
+        self.on_finish(state)
+
+    async def arun_inner(
+        self,
+        state: MutableMapping[str, Any],
+        data_loader: Loader | AsyncLoader,
+    ) -> None:
+        """
+        Run only the main loop of the pipeline in asyncio, without hooks or validation.
+
+        This is the asynchronous counterpart of `run_inner`, and processes the batches
+        the same way as `arun` does.
+
+        Args:
+            state: A dictionary representing the shared pipeline state.
+            data_loader: An iterable or an asynchronous iterable that yields batches
+                of data (as dictionaries).
+
+        Raises:
+            ValueError: If the data loader reuses its batch.
+
+        """
+        if _reuses_batch(data_loader):
+            msg = "Can not run asynchronously with a loader that reuses its batch."
+            raise ValueError(msg)
+
+        if _is_sized(data_loader):
+            state[self._num_steps_key] = len(cast(Sized, data_loader))
+
+        steps = self._async_steps
+        step_key = self.step_name
+
+        step = 0
+        async with contextlib.aclosing(_fetch_ahead(data_loader)) as batches:
+            async for data in batches:
+                state[step_key] = step
+                step += 1
+
+                try:
+                    if await _run_async_steps(steps, state, data) is ABORT:
+                        break
+                except (AbortPipeline, SkipStep) as e:
+                    if isinstance(e, AbortPipeline):
+                        break
+
+    def on_start(self, state: MutableMapping[str, Any]) -> None:
+        """
+        Call the `on_start` hook of each middleware, in order.
+
+        Args:
+            state: A dictionary representing the shared pipeline state.
+
+        """
+        for on_start in self._on_starts:
+            on_start(state)
+
+    def on_finish(self, state: MutableMapping[str, Any]) -> None:
+        """
+        Call the `on_finish` hook of each middleware, in order.
 
-        for mware in self.middlewares:
-            mware.on_finish(state)
+        Args:
+            state: A dictionary representing the shared pipeline state.
+
+        """
+        for on_finish in self._on_finishes:
+            on_finish(state)
 
 
 class PipelineWrapper(Middleware[StrMapping, StrMapping]):
     """
     A middleware that encapsulates an entire `Pipeline` as a single middleware step.
+
+    The `on_start` and `on_finish` hooks of the wrapped pipeline are called once, from
+    the `on_start` and `on_finish` hooks of this middleware, and validation of the
+    wrapped pipeline happens together with validation of the outer pipeline. Each
+    `step` then only runs the main loop of the wrapped pipeline (and each `astep`,
+    when the outer pipeline is run with `arun`, its asynchronous main loop).
     """
 
+    __slots__ = ("_pipeline", "_run_inner", "data_loader")
+
     def __init__(self, pipeline: Pipeline, data_loader: Loader) -> None:
         """
         Initialize a `PipelineWrapper` instance.
@@ -177,6 +603,17 @@ class PipelineWrapper(Middleware[StrMapping, StrMapping]):
         self.pipeline = pipeline
         self.data_loader = data_loader
 
+    @property
+    def pipeline(self) -> Pipeline:
+        """The pipeline to be run when this middleware's `step` function is invoked."""
+        return self._pipeline
+
+    @pipeline.setter
+    def pipeline(self, pipeline: Pipeline) -> None:
+        self._pipeline = pipeline
+        # Bind once, to avoid creating a bound method on each outer step
+        self._run_inner = pipeline.run_inner
+
     def _validate(
         self,
         state_fields: set[str],
@@ -199,14 +636,48 @@ class PipelineWrapper(Middleware[StrMapping, StrMapping]):
                 are missing.
 
         """
-        size_data_loader = isinstance(self.data_loader, Sized)
         self.pipeline.validate(
-            state_fields, self.data_loader.data_fields, size_data_loader
+            state_fields, self.data_loader.data_fields, _is_sized(self.data_loader)
         )
 
+    def on_start(self, state: StrMapping) -> None:
+        """
+        Call the `on_start` hooks of the wrapped pipeline.
+
+        Args:
+            state: A dictionary representing the shared pipeline state.
+
+        """
+        self.pipeline.on_start(state)
+
+    def on_finish(self, state: StrMapping) -> None:
+        """
+        Call the `on_finish` hooks of the wrapped pipeline.
+
+        Args:
+            state: A dictionary representing the shared pipeline state.
+
+        """
+        self.pipeline.on_finish(state)
+
     def step(self, state: StrMapping, data: StrMapping) -> None:  # noqa: ARG002
         """
-        Run the pipeline as a middleware processing step.
+        Run the main loop of the pipeline as a middleware processing step.
+
+        Args:
+            state: A dictionary representing the shared pipeline state, will be passed
+                to the pipeline.
+            data: A dictionary representing step data - will not be used by the
+                pipeline.
+
+        """
+        self._run_inner(state, self.data_loader)
+
+    async def astep(self, state: StrMapping, data: StrMapping) -> None:  # noqa: ARG002
+        """
+        Run the main loop of the pipeline asynchronously, when run by `Pipeline.arun`.
+
+        This lets the middlewares of the wrapped pipeline use `astep` as well.
 
         Args:
             state: A dictionary representing the shared pipeline state, will be passed
@@ -215,4 +686,4 @@ class PipelineWrapper(Middleware[StrMapping, StrMapping]):
                 pipeline.
 
         """
-        self.pipeline.run(state, self.data_loader, validate=False)
+        await self._pipeline.arun_inner(state, self.data_loader)
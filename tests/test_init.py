@@ -0,0 +1,11 @@
+import subprocess
+import sys
+
+
+def test_core_submodule_access() -> None:
+    code = "import middl; print(middl.core.Pipeline is middl.Pipeline)"
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+
+    assert result.stdout.strip() == "True"
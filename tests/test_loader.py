@@ -1,8 +1,24 @@
-from collections.abc import Generator
+import operator
+import sys
+import threading
+from collections.abc import Generator, Iterator, Sized
+from typing import Any
 
 import pytest
 
-from middl import EmptyLoader, WrappedSizedLoader, WrappedUnsizedLoader, wrap_iterable
+from middl import (
+    ChunkedLoader,
+    EmptyLoader,
+    PrefetchLoader,
+    SizedChunkedLoader,
+    SizedPrefetchLoader,
+    WrappedHintedLoader,
+    WrappedSizedLoader,
+    WrappedUnsizedLoader,
+    chunk,
+    prefetch,
+    wrap_iterable,
+)
 
 
 def test_empty_loader() -> None:
@@ -21,6 +37,24 @@ def test_empty_loader() -> None:
     assert output_2 == [{}, {}, {}]
 
 
+def test_empty_loader_reuse_batch() -> None:
+    length = 3
+    gen = EmptyLoader(length, reuse_batch=True)
+
+    assert len(gen) == length
+
+    output = []
+    for batch in gen:
+        assert batch == {}
+        batch["key"] = 1
+        output.append(batch)
+
+    assert output[0] is output[1] is output[2]
+
+    # Each iteration uses its own batch
+    assert next(iter(gen)) is not output[0]
+
+
 def test_zero_fields() -> None:
     data = [(), ()]
     data_fields: tuple[str, ...] = ()
@@ -59,10 +93,34 @@ def test_three_fields() -> None:
             assert k[0] == v[0].upper()
 
 
+def test_batch_unsized_mismatch() -> None:
+    data: list[Any] = [iter(("x", "y"))]
+    with pytest.raises(ValueError, match="wrong number of items, 3 data fields"):
+        list(wrap_iterable(data, ("A", "B", "C")))
+
+
+def test_batch_iteration_error_propagated() -> None:
+    def batch() -> Iterator[str]:
+        yield "x"
+        msg = "boom"
+        raise ValueError(msg)
+
+    data: list[Any] = [batch()]
+    with pytest.raises(ValueError, match="^boom$"):
+        list(wrap_iterable(data, ("A", "B")))
+
+
 def test_batch_size_mismatch() -> None:
     data = [("x", "y")]
     data_fields = ("A", "B", "C")
-    with pytest.raises(ValueError, match="zip\\(\\) argument"):
+    with pytest.raises(ValueError, match="Batch has 2 items, but 3 data fields"):
+        list(wrap_iterable(data, data_fields))
+
+
+def test_batch_size_mismatch_longer() -> None:
+    data = [("x", "y", "z")]
+    data_fields = ("A", "B")
+    with pytest.raises(ValueError, match="Batch has 3 items, but 2 data fields"):
         list(wrap_iterable(data, data_fields))
 
 
@@ -93,3 +151,163 @@ def test_wrap_iterable_unsized() -> None:
     data_fields = ("only_key",)
     wrapped = wrap_iterable(gen(), data_fields)
     assert isinstance(wrapped, WrappedUnsizedLoader)
+    assert not isinstance(wrapped, WrappedHintedLoader)
+
+
+def test_wrap_iterable_length_hint() -> None:
+    data = [("one",), ("two",), ("three",)]
+    wrapped = wrap_iterable(iter(data), ("key",))
+    assert isinstance(wrapped, WrappedHintedLoader)
+    assert not isinstance(wrapped, Sized)
+    assert operator.length_hint(wrapped) == len(data)
+    assert list(wrapped) == [{"key": "one"}, {"key": "two"}, {"key": "three"}]
+
+
+def test_non_identifier_fields() -> None:
+    data = [(1, 2, 3)]
+    data_fields = ("a b", "it's", '"c"')
+    results = list(wrap_iterable(data, data_fields))
+    assert results == [{"a b": 1, "it's": 2, '"c"': 3}]
+
+
+def test_prefetch_sized() -> None:
+    data = [(i,) for i in range(10)]
+    wrapped = prefetch(wrap_iterable(data, ("x",)), depth=3)
+    assert isinstance(wrapped, SizedPrefetchLoader)
+    assert len(wrapped) == len(data)
+    assert wrapped.data_fields == {"x"}
+    assert list(wrapped) == [{"x": i} for i in range(10)]
+
+
+def test_prefetch_unsized() -> None:
+    def gen() -> Generator[tuple[int], None, None]:
+        yield (1,)
+        yield (2,)
+
+    wrapped = prefetch(wrap_iterable(gen(), ("x",)))
+    assert not isinstance(wrapped, SizedPrefetchLoader)
+    assert isinstance(wrapped, PrefetchLoader)
+    assert list(wrapped) == [{"x": 1}, {"x": 2}]
+
+
+def test_prefetch_error() -> None:
+    def gen() -> Generator[tuple[int], None, None]:
+        yield (1,)
+        msg = "loader failed"
+        raise RuntimeError(msg)
+
+    wrapped = prefetch(wrap_iterable(gen(), ("x",)))
+    it = iter(wrapped)
+    assert next(it) == {"x": 1}
+    with pytest.raises(RuntimeError, match="loader failed"):
+        next(it)
+
+
+def test_prefetch_base_exception() -> None:
+    def gen() -> Generator[tuple[int], None, None]:
+        yield (1,)
+        sys.exit(3)
+
+    it = iter(prefetch(wrap_iterable(gen(), ("x",))))
+    assert next(it) == {"x": 1}
+    with pytest.raises(SystemExit):
+        next(it)
+
+
+def test_prefetch_stops_early() -> None:
+    finished = threading.Event()
+
+    def gen() -> Generator[tuple[int], None, None]:
+        try:
+            for i in range(1000):
+                yield (i,)
+        finally:
+            finished.set()
+
+    it = iter(prefetch(wrap_iterable(gen(), ("x",)), depth=1))
+    assert next(it) == {"x": 0}
+    it.close()  # type: ignore[attr-defined]
+    assert finished.wait(timeout=5)
+
+
+def test_prefetch_invalid_depth() -> None:
+    with pytest.raises(ValueError, match="at least 1"):
+        PrefetchLoader(EmptyLoader(3), depth=0)
+
+
+def test_prefetch_reused_batch() -> None:
+    with pytest.raises(ValueError, match="reuses its batch"):
+        prefetch(EmptyLoader(3, reuse_batch=True))
+
+
+def test_sized_loader_length_cached() -> None:
+    class CountingList(list[tuple[str]]):
+        len_calls = 0
+
+        def __len__(self) -> int:
+            CountingList.len_calls += 1
+            return super().__len__()
+
+    data = CountingList([("a",), ("b",)])
+    wrapped = wrap_iterable(data, ("key",))
+    assert isinstance(wrapped, WrappedSizedLoader)
+    assert len(wrapped) == len(data)
+    assert len(wrapped) == len(data)
+    # Two calls by the test itself, only one by the wrapper
+    assert CountingList.len_calls == 3  # noqa: PLR2004
+
+
+def test_wrapped_fields_shared() -> None:
+    wrapped_1 = wrap_iterable([("a", "b")], ("A", "B"))
+    wrapped_2 = wrap_iterable([("c", "d")], ["A", "B"])
+    assert wrapped_1.data_fields == {"A", "B"}
+    assert isinstance(wrapped_1.data_fields, frozenset)
+    assert wrapped_1.data_fields is wrapped_2.data_fields
+
+
+def test_chunk_sized() -> None:
+    data = [(i, str(i)) for i in range(5)]
+    wrapped = chunk(wrap_iterable(data, ("x", "y")), chunk_size=2)
+    assert isinstance(wrapped, SizedChunkedLoader)
+    assert wrapped.data_fields == {"x", "y"}
+    assert len(wrapped) == len(list(wrapped)) == 3  # noqa: PLR2004
+    assert list(wrapped) == [
+        {"x": [0, 1], "y": ["0", "1"]},
+        {"x": [2, 3], "y": ["2", "3"]},
+        {"x": [4], "y": ["4"]},
+    ]
+
+
+def test_chunk_drop_last() -> None:
+    data = [(i,) for i in range(5)]
+    wrapped = chunk(wrap_iterable(data, ("x",)), chunk_size=2, drop_last=True)
+    assert isinstance(wrapped, SizedChunkedLoader)
+    assert len(wrapped) == len(list(wrapped)) == 2  # noqa: PLR2004
+    assert list(wrapped) == [{"x": [0, 1]}, {"x": [2, 3]}]
+
+
+def test_chunk_unsized_collate() -> None:
+    def gen() -> Generator[tuple[int], None, None]:
+        yield from ((i,) for i in range(4))
+
+    wrapped = chunk(wrap_iterable(gen(), ("x",)), chunk_size=3, collate=tuple)
+    assert isinstance(wrapped, ChunkedLoader)
+    assert not isinstance(wrapped, SizedChunkedLoader)
+    assert list(wrapped) == [{"x": (0, 1, 2)}, {"x": (3,)}]
+
+
+def test_chunk_invalid_size() -> None:
+    with pytest.raises(ValueError, match="at least 1"):
+        ChunkedLoader(EmptyLoader(3), chunk_size=0)
+
+
+def test_loaders_have_no_instance_dict() -> None:
+    loaders = [
+        EmptyLoader(3),
+        wrap_iterable([("a",)], ("key",)),
+        wrap_iterable(iter([("a",)]), ("key",)),
+        prefetch(EmptyLoader(3)),
+        chunk(EmptyLoader(3), chunk_size=2),
+    ]
+    for loader in loaders:
+        assert not hasattr(loader, "__dict__")
@@ -2,7 +2,8 @@ from typing import Any
 
 import pytest
 
-from middl import Middleware, ValidationError
+from middl import Middleware, ValidationError, fields
+from middl.core.middleware import _intern_fields
 
 
 class _TestMiddleware(Middleware[Any, Any]):
@@ -40,3 +41,70 @@ def test_validate_missing_data_fields() -> None:
     data_fields = {"data_req1"}
     with pytest.raises(ValidationError, match="Missing data fields {'data_req2'}"):
         mw._validate(state_fields, data_fields)
+
+
+def test_freeze() -> None:
+    mw = _TestMiddleware()
+    mw.requires_state_fields = {"state_req1"}
+    mw.requires_data_fields = {"data_req1"}
+    mw.provides_data_fields = {"data_prov1"}
+    frozen = mw.freeze()
+
+    assert frozen == (fields("state_req1"), fields("data_req1"), fields("data_prov1"))
+    assert all(isinstance(field_set, frozenset) for field_set in frozen)
+    assert mw.freeze() is frozen
+
+    # The field sets stay mutable, and the frozen copies follow their changes
+    assert isinstance(mw.requires_state_fields, set)
+    mw.requires_data_fields.add("data_req2")
+    assert mw.freeze()[1] == {"data_req1", "data_req2"}
+
+    with pytest.raises(ValidationError, match="Missing data fields"):
+        mw._validate({"state_req1"}, {"data_req1"})
+
+
+def test_freeze_without_super_init() -> None:
+    class NoInitMiddleware(Middleware[Any, Any]):
+        def __init__(self) -> None:
+            self.requires_state_fields = {"state_req1"}
+            self.requires_data_fields = set()
+            self.provides_data_fields = set()
+
+    mw = NoInitMiddleware()
+    assert mw.freeze() == (fields("state_req1"), fields(), fields())
+
+
+def test_fields_interned() -> None:
+    assert fields("a", "b") == {"a", "b"}
+    assert fields("a", "b") is fields("b", "a")
+    assert fields() is fields()
+
+
+def test_fields_interning_bounded() -> None:
+    for i in range(2000):
+        fields(str(i))
+
+    assert _intern_fields.cache_info().currsize == 1024  # noqa: PLR2004
+
+
+def test_freeze_interns_fields() -> None:
+    mw_1 = _TestMiddleware()
+    mw_1.requires_data_fields = {"data_req1"}
+    mw_2 = _TestMiddleware()
+    mw_2.requires_data_fields = {"data_req1"}
+
+    assert mw_1.freeze()[1] is mw_2.freeze()[1]
+
+
+def test_add_fields_in_init() -> None:
+    class AddingMiddleware(Middleware[Any, Any]):
+        def __init__(self) -> None:
+            super().__init__()
+            self.requires_state_fields.add("state_req1")
+            self.provides_data_fields.add("data_prov1")
+
+    mw = AddingMiddleware()
+    data_fields: set[str] = set()
+    mw._validate({"state_req1"}, data_fields)
+
+    assert data_fields == {"data_prov1"}
@@ -1,15 +1,20 @@
+import asyncio
+from collections.abc import AsyncIterator
 from typing import Any
 from unittest.mock import MagicMock
 
 import pytest
 
 from middl import (
+    ABORT,
+    SKIP,
     AbortPipeline,
     EmptyLoader,
     Middleware,
     Pipeline,
     PipelineWrapper,
     SkipStep,
+    StepSignal,
     ValidationError,
     WrappedUnsizedLoader,
     wrap_iterable,
@@ -17,8 +22,11 @@ from middl import (
 
 
 class AccMiddleware(Middleware[Any, Any]):
+    def on_start(self, state: Any) -> None:
+        self._append = state["acc"].append
+
     def step(self, state: Any, data: Any) -> None:
-        state["acc"].append(state["value"])
+        self._append(state["value"])
 
 
 class _SimpleMiddleware(Middleware[Any, Any]):
@@ -51,6 +59,32 @@ def test_validate_missing_state_field() -> None:
         pipe.validate(set(), set(), sized_data_loader=False)
 
 
+def test_validation_error_attributes() -> None:
+    sm = _SimpleMiddleware()
+    sm.requires_state_fields = {"miss"}
+
+    pipe = Pipeline(middlewares=[_SimpleMiddleware(), sm])
+
+    with pytest.raises(ValidationError) as exc_info:
+        pipe.validate(set(), set(), sized_data_loader=False)
+
+    error = exc_info.value
+    assert (error.middleware, error.index) == ("_SimpleMiddleware", 1)
+    assert isinstance(error.__cause__, ValidationError)
+    assert error.__cause__.missing == {"miss"}
+    assert str(error.__cause__) == "Missing state fields {'miss'}"
+
+    assert repr(error) == (
+        "ValidationError('Validation error by middleware _SimpleMiddleware,"
+        " at index 1.')"
+    )
+    assert repr(error.__cause__) == "ValidationError(\"Missing state fields {'miss'}\")"
+
+    # Errors with a plain message keep working as before
+    assert str(ValidationError("message")) == "message"
+    assert repr(ValidationError("message")) == "ValidationError('message')"
+
+
 def test_validate_ok() -> None:
     sm1 = _SimpleMiddleware()
     sm1.requires_state_fields = {"miss"}
@@ -227,3 +261,347 @@ def test_pipeline_wrapper_ok() -> None:
 
     # State after all pipelines/loops have been run
     assert state == {"epoch": 2, "num_epochs": 3, "num_steps": 5, "step": 4}
+
+
+def test_reassign_middlewares() -> None:
+    class MyMiddleware(Middleware[Any, Any]):
+        def step(self, state: Any, data: Any) -> None:
+            state["value"] = state["step"] * 10
+
+    state: Any = {"acc": [], "value": 0}
+
+    pipeline = Pipeline(middlewares=[AccMiddleware()])
+    pipeline.middlewares = [MyMiddleware(), AccMiddleware()]
+    pipeline.run(state=state, data_loader=EmptyLoader(3))
+
+    assert isinstance(pipeline.middlewares, tuple)
+    assert state["acc"] == [0, 10, 20]
+
+
+def test_abort_pipeline_subclass() -> None:
+    class MyAbort(AbortPipeline):
+        pass
+
+    class MyMiddleware(Middleware[Any, Any]):
+        def step(self, state: Any, data: Any) -> None:
+            state["value"] = state["step"] + 1
+            if state["step"] == 1:
+                raise MyAbort
+
+    state: Any = {"acc": []}
+
+    pipeline = Pipeline(middlewares=[MyMiddleware(), AccMiddleware()])
+    pipeline.run(state=state, data_loader=EmptyLoader(3))
+
+    assert state["acc"] == [1]
+
+
+def test_validate_not_cached() -> None:
+    class CountingMiddleware(Middleware[Any, Any]):
+        calls = 0
+
+        def _validate(self, state_fields: set[str], data_fields: set[str]) -> None:
+            CountingMiddleware.calls += 1
+            super()._validate(state_fields, data_fields)
+
+    mware = CountingMiddleware()
+    mware.requires_state_fields = {"miss"}
+    pipe = Pipeline(middlewares=[mware])
+
+    pipe.validate({"miss"}, set(), sized_data_loader=False)
+    pipe.validate({"miss"}, set(), sized_data_loader=False)
+    assert CountingMiddleware.calls == 2  # noqa: PLR2004
+
+    with pytest.raises(ValidationError, match="at index 0") as exc_info:
+        pipe.validate(set(), set(), sized_data_loader=False)
+    assert isinstance(exc_info.value.__cause__, ValidationError)
+    assert CountingMiddleware.calls == 3  # noqa: PLR2004
+
+
+def test_validate_fields_changed_after_assignment() -> None:
+    sm = _SimpleMiddleware()
+    pipe = Pipeline(middlewares=[sm])
+    pipe.validate(set(), set(), sized_data_loader=False)
+
+    sm.requires_state_fields = {"needed"}
+    with pytest.raises(ValidationError, match="at index 0"):
+        pipe.validate(set(), set(), sized_data_loader=False)
+
+    sm.requires_state_fields.discard("needed")
+    pipe.validate(set(), set(), sized_data_loader=False)
+
+
+def test_validate_wrapper_changed_after_assignment() -> None:
+    mware = _SimpleMiddleware()
+    mware.requires_data_fields = {"x"}
+    pipe_mware = PipelineWrapper(Pipeline([mware]), wrap_iterable([(1,)], ["x"]))
+    outer_pipeline = Pipeline([pipe_mware], step_name="epoch")
+    outer_pipeline.validate(set(), set(), sized_data_loader=True)
+
+    pipe_mware.data_loader = EmptyLoader(1)
+    with pytest.raises(ValidationError, match="PipelineWrapper, at index 0"):
+        outer_pipeline.validate(set(), set(), sized_data_loader=True)
+
+    pipe_mware.data_loader = wrap_iterable([(1,)], ["x"])
+    outer_pipeline.validate(set(), set(), sized_data_loader=True)
+
+    pipe_mware.pipeline = Pipeline([mware, mware], step_name="other")
+    mware.requires_state_fields = {"step"}
+    with pytest.raises(ValidationError, match="PipelineWrapper, at index 0"):
+        outer_pipeline.validate(set(), set(), sized_data_loader=True)
+
+
+def test_middleware_fields_not_replaced() -> None:
+    sm = _SimpleMiddleware()
+    sm.requires_state_fields = {"miss"}
+    sm.provides_data_fields = {"val"}
+
+    Pipeline(middlewares=[sm])
+
+    # The pipeline does not replace the field sets of its middlewares
+    assert isinstance(sm.requires_state_fields, set)
+    assert isinstance(sm.requires_data_fields, set)
+    assert isinstance(sm.provides_data_fields, set)
+
+
+def test_overridden_callbacks() -> None:
+    class HookMiddleware(Middleware[Any, Any]):
+        def __init__(self, name: str) -> None:
+            super().__init__()
+            self.name = name
+
+        def on_start(self, state: Any) -> None:
+            state["calls"].append(f"start {self.name}")
+
+        def on_finish(self, state: Any) -> None:
+            state["calls"].append(f"finish {self.name}")
+
+    state: Any = {"calls": []}
+    pipeline = Pipeline(
+        middlewares=[HookMiddleware("a"), _SimpleMiddleware(), HookMiddleware("b")]
+    )
+    pipeline.run(state=state, data_loader=EmptyLoader(3))
+
+    assert state["calls"] == ["start a", "start b", "finish a", "finish b"]
+
+
+def test_pipeline_wrapper_validate_inner() -> None:
+    mware = _SimpleMiddleware()
+    mware.requires_state_fields = {"miss"}
+
+    pipe_mware = PipelineWrapper(Pipeline([mware]), EmptyLoader(5))
+    outer_pipeline = Pipeline([pipe_mware], step_name="epoch")
+
+    with pytest.raises(
+        ValidationError,
+        match="Validation error by middleware PipelineWrapper, at index 0.",
+    ):
+        outer_pipeline.run({}, EmptyLoader(3))
+
+
+def test_wrapper_calls_inner_hooks_once() -> None:
+    class HookMiddleware(Middleware[Any, Any]):
+        def on_start(self, state: Any) -> None:
+            state["calls"].append("start")
+
+        def on_finish(self, state: Any) -> None:
+            state["calls"].append("finish")
+
+    pipe_mware = PipelineWrapper(Pipeline([HookMiddleware()]), EmptyLoader(2))
+    outer_pipeline = Pipeline([pipe_mware], step_name="epoch")
+
+    state: dict[str, Any] = {"calls": []}
+    outer_pipeline.run(state, EmptyLoader(3))
+
+    assert state["calls"] == ["start", "finish"]
+    assert state["num_steps"] == 2  # noqa: PLR2004
+
+
+def test_wrapper_reassign_pipeline() -> None:
+    class MyMiddleware(Middleware[Any, Any]):
+        def step(self, state: Any, data: Any) -> None:
+            state["value"] = "new"
+
+    pipe_mware = PipelineWrapper(Pipeline([]), EmptyLoader(1))
+    pipe_mware.pipeline = Pipeline([MyMiddleware()])
+
+    state: dict[str, Any] = {}
+    Pipeline([pipe_mware], step_name="epoch").run(state, EmptyLoader(1))
+
+    assert state["value"] == "new"
+
+
+def test_run_prefetch() -> None:
+    class MyMiddleware(Middleware[Any, Any]):
+        def step(self, state: Any, data: Any) -> None:
+            state["acc"].append(data["x"])
+            if data["x"] == 3:  # noqa: PLR2004
+                raise AbortPipeline
+
+    loader = wrap_iterable([(i,) for i in range(10)], ["x"])
+    state: dict[str, Any] = {"acc": []}
+    Pipeline([MyMiddleware()]).run(state, loader, prefetch=2)
+
+    assert state["acc"] == [0, 1, 2, 3]
+    assert state["num_steps"] == 10  # noqa: PLR2004
+
+
+def test_run_many_middlewares() -> None:
+    class IncMiddleware(Middleware[Any, Any]):
+        def step(self, state: Any, data: Any) -> None:
+            state["value"] += 1
+
+    state: dict[str, Any] = {"value": 0}
+    Pipeline([IncMiddleware() for _ in range(40)]).run(state, EmptyLoader(2))
+
+    assert state["value"] == 80  # noqa: PLR2004
+
+
+def test_step_signals() -> None:
+    class SignalMiddleware(Middleware[Any, Any]):
+        def step(self, state: Any, data: Any) -> StepSignal | None:
+            if state["step"] == 1:
+                return SKIP
+            if state["step"] == 3:  # noqa: PLR2004
+                return ABORT
+            return None
+
+    state: Any = {"acc": [], "value": 1}
+    pipeline = Pipeline(middlewares=[SignalMiddleware(), AccMiddleware()])
+    pipeline.run(state=state, data_loader=EmptyLoader(5))
+
+    assert state["acc"] == [1, 1]
+    assert state["step"] == 3  # noqa: PLR2004
+
+
+def test_step_return_value_ignored() -> None:
+    class ReturnMiddleware(Middleware[Any, Any]):
+        def step(self, state: Any, data: Any) -> bool:  # type: ignore[override]
+            return True
+
+    for num_ret in (1, 40):
+        middlewares = [ReturnMiddleware() for _ in range(num_ret)]
+        pipeline = Pipeline(middlewares=[*middlewares, AccMiddleware()])
+
+        state: Any = {"acc": [], "value": 1}
+        pipeline.run(state=state, data_loader=EmptyLoader(3))
+        assert state["acc"] == [1, 1, 1]
+
+        state = {"acc": [], "value": 1}
+        asyncio.run(pipeline.arun(state=state, data_loader=EmptyLoader(3)))
+        assert state["acc"] == [1, 1, 1]
+
+
+def test_arun() -> None:
+    class AsyncAccMiddleware(Middleware[Any, Any]):
+        async def astep(self, state: Any, data: Any) -> StepSignal | None:
+            await asyncio.sleep(0)
+            state["acc"].append(data["x"])
+            return ABORT if data["x"] == 2 else None  # noqa: PLR2004
+
+    loader = wrap_iterable([(i,) for i in range(5)], ["x"])
+    state: dict[str, Any] = {"acc": []}
+    asyncio.run(Pipeline([AsyncAccMiddleware()]).arun(state, loader))
+
+    assert state["acc"] == [0, 1, 2]
+    assert state["num_steps"] == 5  # noqa: PLR2004
+
+
+def test_run_async_only_middleware() -> None:
+    class AsyncAccMiddleware(Middleware[Any, Any]):
+        async def astep(self, state: Any, data: Any) -> None:
+            state["acc"].append(state["step"])
+
+    pipeline = Pipeline([AccMiddleware(), AsyncAccMiddleware()])
+    with pytest.raises(ValidationError, match="AsyncAccMiddleware, at index 1"):
+        pipeline.run({"acc": [], "value": 1}, EmptyLoader(2))
+
+    # Wrapped, the middleware runs with the outer arun, and fails with the outer run
+    outer_pipeline = Pipeline(
+        [PipelineWrapper(Pipeline([AsyncAccMiddleware()]), EmptyLoader(2))],
+        step_name="epoch",
+    )
+    state: dict[str, Any] = {"acc": []}
+    asyncio.run(outer_pipeline.arun(state, EmptyLoader(2)))
+    assert state["acc"] == [0, 1, 0, 1]
+
+    with pytest.raises(ValidationError, match="AsyncAccMiddleware, at index 0"):
+        outer_pipeline.run({"acc": []}, EmptyLoader(2))
+
+
+def test_arun_skips_not_overridden() -> None:
+    class HookMiddleware(Middleware[Any, Any]):
+        def on_start(self, state: Any) -> None:
+            state["started"] = True
+
+    pipeline = Pipeline([HookMiddleware(), AccMiddleware()])
+    assert len(pipeline._async_steps) == 1
+
+    state: dict[str, Any] = {"acc": [], "value": 1}
+    asyncio.run(pipeline.arun(state, EmptyLoader(2)))
+    assert state["acc"] == [1, 1]
+    assert state["started"]
+
+
+def test_read_ahead_reused_batch() -> None:
+    pipeline = Pipeline([AccMiddleware()])
+    loader = EmptyLoader(3, reuse_batch=True)
+
+    with pytest.raises(ValueError, match="reuses its batch"):
+        pipeline.run({"acc": [], "value": 1}, loader, prefetch=2)
+
+    with pytest.raises(ValueError, match="reuses its batch"):
+        asyncio.run(pipeline.arun({"acc": [], "value": 1}, loader))
+
+    # Without read-ahead, the reused batch works
+    state: dict[str, Any] = {"acc": [], "value": 1}
+    pipeline.run(state, loader)
+    assert state["acc"] == [1, 1, 1]
+
+
+def test_arun_async_loader() -> None:
+    class MyAsyncLoader:
+        data_fields = frozenset({"x"})
+
+        async def __aiter__(self) -> AsyncIterator[dict[str, Any]]:
+            for i in range(3):
+                await asyncio.sleep(0)
+                yield {"x": i}
+
+    class MyMiddleware(Middleware[Any, Any]):
+        def step(self, state: Any, data: Any) -> None:
+            state["acc"].append((state["step"], data["x"]))
+
+    mware = MyMiddleware()
+    mware.requires_data_fields = {"x"}
+
+    state: dict[str, Any] = {"acc": []}
+    asyncio.run(Pipeline([mware]).arun(state, MyAsyncLoader()))
+
+    assert state["acc"] == [(0, 0), (1, 1), (2, 2)]
+    assert "num_steps" not in state
+
+
+def test_run_zero_and_one_middleware() -> None:
+    state: dict[str, Any] = {}
+    Pipeline([]).run(state, EmptyLoader(3))
+    assert state == {"step": 2, "num_steps": 3}
+
+    class AbortMiddleware(Middleware[Any, Any]):
+        def step(self, state: Any, data: Any) -> StepSignal | None:
+            return ABORT if state["step"] == 1 else None
+
+    state = {}
+    Pipeline([AbortMiddleware()]).run(state, EmptyLoader(3))
+    assert state["step"] == 1
+
+
+def test_run_loader_len_none() -> None:
+    class UnsizedList(list[dict[str, Any]]):
+        __len__ = None  # type: ignore[assignment]
+        data_fields: frozenset[str] = frozenset()
+
+    state: dict[str, Any] = {}
+    Pipeline([]).run(state, UnsizedList([{}, {}]))
+
+    assert state == {"step": 1}